@@ -6,9 +6,9 @@ This script should be run once initially to build the videos database
 import os
 import sys
 from datetime import datetime
+import httplib2
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-import time
 
 # Add src to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -20,9 +20,12 @@ from utils import (
     get_env_variable,
     setup_logging,
     parse_date_from_title,
-    create_backup
+    save_descriptions
 )
 
+# Placeholder titles YouTube uses for videos that can't be watched
+SKIP_TITLES = frozenset({'Private video', 'Deleted video', 'Unavailable video'})
+
 def get_channel_id_from_handle(youtube, handle: str) -> str:
     """
     Get channel ID from channel handle (e.g., @TheDailyWoo)
@@ -92,10 +95,13 @@ def get_channel_uploads_playlist(youtube, channel_id: str) -> tuple:
     except HttpError as e:
         raise Exception(f"Error getting channel info: {e}")
 
-def fetch_all_videos_from_playlist(youtube, playlist_id: str, config: dict, logger) -> list:
+def fetch_all_videos_from_playlist(youtube, playlist_id: str, config: dict, logger) -> tuple:
     """
     Fetch all videos from a playlist (handles pagination)
     
+    Descriptions are returned separately from the video dictionaries, since
+    they are stored outside videos.json.
+    
     Args:
         youtube: YouTube API client
         playlist_id: Playlist ID (uploads playlist)
@@ -103,18 +109,19 @@ def fetch_all_videos_from_playlist(youtube, playlist_id: str, config: dict, logg
         logger: Logger instance
     
     Returns:
-        List of video dictionaries
+        Tuple of (list of video dictionaries, dict of video ID -> description)
     """
     videos = []
+    descriptions = {}
     next_page_token = None
     page_count = 0
     
-    logger.info(f"Fetching videos from playlist: {playlist_id}")
+    logger.info("Fetching videos from playlist: %s", playlist_id)
     
     while True:
         try:
             request = youtube.playlistItems().list(
-                part='snippet,contentDetails',
+                part='snippet',
                 playlistId=playlist_id,
                 maxResults=50,  # Max allowed by API
                 pageToken=next_page_token
@@ -123,18 +130,17 @@ def fetch_all_videos_from_playlist(youtube, playlist_id: str, config: dict, logg
             
             page_count += 1
             items = response.get('items', [])
-            logger.info(f"Page {page_count}: Found {len(items)} videos")
+            logger.info("Page %s: Found %s videos", page_count, len(items))
             
             for item in items:
                 snippet = item['snippet']
                 
-                # Skip private/deleted videos
-                if snippet['title'] == 'Private video' or snippet['title'] == 'Deleted video':
+                # Skip private/deleted/unavailable videos
+                if snippet['title'] in SKIP_TITLES:
                     continue
                 
                 video_id = snippet['resourceId']['videoId']
                 title = snippet['title']
-                description = snippet.get('description', '')
                 upload_date = snippet['publishedAt'][:10]  # YYYY-MM-DD
                 
                 # Try to parse recording date from title
@@ -150,7 +156,6 @@ def fetch_all_videos_from_playlist(youtube, playlist_id: str, config: dict, logg
                 video_data = {
                     'video_id': video_id,
                     'title': title,
-                    'description': description,
                     'upload_date': upload_date,
                     'recording_date': recording_date,
                     'url': f'https://www.youtube.com/watch?v={video_id}',
@@ -158,21 +163,19 @@ def fetch_all_videos_from_playlist(youtube, playlist_id: str, config: dict, logg
                 }
                 
                 videos.append(video_data)
+                descriptions[video_id] = snippet.get('description', '')
             
             # Check if there are more pages
             next_page_token = response.get('nextPageToken')
             if not next_page_token:
                 break
             
-            # Be nice to the API
-            time.sleep(0.5)
-            
         except HttpError as e:
-            logger.error(f"Error fetching videos: {e}")
+            logger.error("Error fetching videos: %s", e)
             break
     
-    logger.info(f"Total videos fetched: {len(videos)}")
-    return videos
+    logger.info("Total videos fetched: %s", len(videos))
+    return videos, descriptions
 
 def main():
     """Main function to fetch all videos"""
@@ -190,28 +193,46 @@ def main():
     channel_handle = get_env_variable('YOUTUBE_CHANNEL_HANDLE', required=False) or config['channel']['handle']
     
     # Build YouTube API client
+    # One Http instance keeps a single TLS connection open for every API
+    # call; the discovery document bundled with the client library is used
     logger.info("Connecting to YouTube API...")
-    youtube = build('youtube', 'v3', developerKey=api_key)
+    http = httplib2.Http(timeout=60)
+    youtube = build('youtube', 'v3', developerKey=api_key, http=http, static_discovery=True)
+    
+    # Load existing database (if any); a broken one is rebuilt from scratch
+    try:
+        existing_db = load_videos_db()
+    except Exception as e:
+        logger.warning("Ignoring existing database: %s", e)
+        existing_db = {}
+    existing_info = existing_db.get('channel_info', {})
     
-    # Get channel ID
-    logger.info(f"Finding channel: {channel_handle}")
-    channel_id = get_channel_id_from_handle(youtube, channel_handle)
-    logger.info(f"Channel ID: {channel_id}")
+    if (existing_info.get('channel_handle') == channel_handle
+            and existing_info.get('channel_id')
+            and existing_info.get('uploads_playlist_id')):
+        # A channel's uploads playlist never changes, so skip the lookups
+        # (the channel search alone costs 100 quota units)
+        channel_id = existing_info['channel_id']
+        uploads_playlist_id = existing_info['uploads_playlist_id']
+        channel_title = existing_info.get('channel_name')
+        logger.info("Using saved channel info for %s", channel_handle)
+    else:
+        # Get channel ID
+        logger.info("Finding channel: %s", channel_handle)
+        channel_id = get_channel_id_from_handle(youtube, channel_handle)
+        
+        # Get uploads playlist
+        logger.info("Getting uploads playlist...")
+        uploads_playlist_id, channel_title = get_channel_uploads_playlist(youtube, channel_id)
     
-    # Get uploads playlist
-    logger.info("Getting uploads playlist...")
-    uploads_playlist_id, channel_title = get_channel_uploads_playlist(youtube, channel_id)
-    logger.info(f"Channel: {channel_title}")
-    logger.info(f"Uploads Playlist ID: {uploads_playlist_id}")
+    logger.info("Channel ID: %s", channel_id)
+    logger.info("Channel: %s", channel_title)
+    logger.info("Uploads Playlist ID: %s", uploads_playlist_id)
     
     # Fetch all videos
-    videos = fetch_all_videos_from_playlist(youtube, uploads_playlist_id, config, logger)
+    videos, descriptions = fetch_all_videos_from_playlist(youtube, uploads_playlist_id, config, logger)
     
-    # Load existing database (if any) and backup
     db_path = os.path.join('data', 'videos.json')
-    if os.path.exists(db_path):
-        logger.info("Backing up existing database...")
-        create_backup(db_path)
     
     # Create database structure
     videos_db = {
@@ -226,29 +247,56 @@ def main():
         'videos': videos
     }
     
-    # Save to JSON
-    logger.info("Saving videos database...")
-    save_videos_db(videos_db)
+    # Only rewrite the database when the fetch found changes
+    unchanged = existing_db.get('videos') == videos and all(
+        existing_info.get(key) == value
+        for key, value in videos_db['channel_info'].items()
+        if key != 'last_updated'
+    )
+    
+    if unchanged:
+        logger.info("No changes since last fetch - database left as is")
+    else:
+        # Save to JSON, keeping the existing database (if any) as a backup
+        logger.info("Saving videos database...")
+        save_videos_db(videos_db, backup=True)
+    
+    # Descriptions live in their own file and can change independently
+    if save_descriptions(descriptions):
+        logger.info("Saved video descriptions")
     
     # Statistics
     logger.info("")
     logger.info("=" * 60)
     logger.info("FETCH COMPLETE")
     logger.info("=" * 60)
-    logger.info(f"Total videos: {len(videos)}")
+    logger.info("Total videos: %s", len(videos))
+    
+    # Count dated videos and track the date range in one pass
+    # (ISO dates compare correctly as strings)
+    videos_with_dates = 0
+    first_date = last_date = None
+    for v in videos:
+        recording_date = v.get('recording_date')
+        if recording_date:
+            videos_with_dates += 1
+            if first_date is None or recording_date < first_date:
+                first_date = recording_date
+            if last_date is None or recording_date > last_date:
+                last_date = recording_date
     
-    videos_with_dates = sum(1 for v in videos if v.get('recording_date'))
-    logger.info(f"Videos with recording dates: {videos_with_dates}")
-    logger.info(f"Videos without dates: {len(videos) - videos_with_dates}")
+    logger.info("Videos with recording dates: %s", videos_with_dates)
+    logger.info("Videos without dates: %s", len(videos) - videos_with_dates)
     
     # Date range
     if videos_with_dates > 0:
-        dates = [v['recording_date'] for v in videos if v.get('recording_date')]
-        dates.sort()
-        logger.info(f"Date range: {dates[0]} to {dates[-1]}")
+        logger.info("Date range: %s to %s", first_date, last_date)
     
     logger.info("")
-    logger.info(f"Database saved to: {db_path}")
+    if unchanged:
+        logger.info("Database unchanged: %s", db_path)
+    else:
+        logger.info("Database saved to: %s", db_path)
     logger.info("You can now run update_playlist.py to create today's playlist!")
 
 if __name__ == '__main__':
@@ -5,8 +5,10 @@ This script runs daily via GitHub Actions
 
 import os
 import sys
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import praw
-from datetime import datetime
 
 # Add src to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -18,34 +20,45 @@ from utils import (
     get_today_date,
     get_env_variable,
     setup_logging,
-    format_video_list_for_reddit
+    format_video_list_for_reddit,
+    compile_template
 )
 
-def get_reddit_client(config: dict) -> praw.Reddit:
+# Upper bound on concurrent submissions when posting to several subreddits
+MAX_POST_WORKERS = 4
+
+# Requests a single post can cost (submit, flair choices, flair select)
+REQUESTS_PER_POST = 3
+
+def get_reddit_credentials() -> dict:
+    """
+    Read Reddit credentials from environment variables
+    
+    Returns:
+        Dictionary of praw.Reddit keyword arguments
+    
+    Raises:
+        Exception if a required variable is missing
+    """
+    return {
+        'client_id': get_env_variable('REDDIT_CLIENT_ID'),
+        'client_secret': get_env_variable('REDDIT_CLIENT_SECRET'),
+        'username': get_env_variable('REDDIT_USERNAME'),
+        'password': get_env_variable('REDDIT_PASSWORD'),
+        'user_agent': get_env_variable('REDDIT_USER_AGENT', required=False) or 'adam-the-woo-on-this-day-bot/1.0'
+    }
+
+def get_reddit_client(credentials: dict) -> praw.Reddit:
     """
     Create authenticated Reddit client
     
     Args:
-        config: Configuration dictionary
+        credentials: Credentials from get_reddit_credentials
     
     Returns:
         Authenticated Reddit instance
     """
-    client_id = get_env_variable('REDDIT_CLIENT_ID')
-    client_secret = get_env_variable('REDDIT_CLIENT_SECRET')
-    username = get_env_variable('REDDIT_USERNAME')
-    password = get_env_variable('REDDIT_PASSWORD')
-    user_agent = get_env_variable('REDDIT_USER_AGENT', required=False) or 'adam-the-woo-on-this-day-bot/1.0'
-    
-    reddit = praw.Reddit(
-        client_id=client_id,
-        client_secret=client_secret,
-        username=username,
-        password=password,
-        user_agent=user_agent
-    )
-    
-    return reddit
+    return praw.Reddit(**credentials)
 
 def create_reddit_post(reddit: praw.Reddit, subreddit_name: str, title: str, 
                       body: str, flair_text: str = None, logger = None) -> str:
@@ -75,26 +88,87 @@ def create_reddit_post(reddit: praw.Reddit, subreddit_name: str, title: str,
         # Add flair if specified and available
         if flair_text:
             try:
-                # Get available flairs
-                flair_choices = list(submission.flair.choices())
+                # Find matching flair, stopping at the first match
+                flair = next(
+                    (f for f in submission.flair.choices() if f['flair_text'] == flair_text),
+                    None
+                )
                 
-                # Find matching flair
-                for flair in flair_choices:
-                    if flair['flair_text'] == flair_text:
-                        submission.flair.select(flair['flair_template_id'])
-                        logger.info(f"Applied flair: {flair_text}")
-                        break
+                if flair:
+                    submission.flair.select(flair['flair_template_id'])
+                    logger.info("Applied flair: %s", flair_text)
             except Exception as e:
-                logger.warning(f"Could not apply flair: {e}")
+                logger.warning("Could not apply flair: %s", e)
         
         post_url = f"https://www.reddit.com{submission.permalink}"
-        logger.info(f"Post created: {post_url}")
+        logger.info("Post created: %s", post_url)
         
         return post_url
         
     except Exception as e:
         raise Exception(f"Error creating Reddit post: {e}")
 
+def create_reddit_posts(credentials: dict, subreddit_names: list, title: str,
+                       body: str, flair_text: str = None, logger = None) -> dict:
+    """
+    Create the same post in several subreddits concurrently
+    
+    The first subreddit is posted to on its own, so the rate-limit budget
+    Reddit reports for the account is known before fanning out; the rest
+    are posted from a thread pool capped by that budget. PRAW instances are
+    not thread-safe, so each worker thread authenticates its own client.
+    Failures are logged and the subreddit is left out of the result.
+    
+    Args:
+        credentials: Credentials from get_reddit_credentials
+        subreddit_names: Names of subreddits to post to
+        title: Post title
+        body: Post body (markdown)
+        flair_text: Optional flair text
+        logger: Logger instance
+    
+    Returns:
+        Dictionary mapping subreddit name to URL of created post
+    """
+    post_urls = {}
+    
+    if not subreddit_names:
+        return post_urls
+    
+    def post(reddit: praw.Reddit, subreddit_name: str) -> None:
+        try:
+            post_urls[subreddit_name] = create_reddit_post(
+                reddit, subreddit_name, title, body, flair_text, logger
+            )
+        except Exception as e:
+            logger.error("r/%s: %s", subreddit_name, e)
+    
+    first, rest = subreddit_names[0], subreddit_names[1:]
+    reddit = get_reddit_client(credentials)
+    post(reddit, first)
+    
+    if not rest:
+        return post_urls
+    
+    workers = min(len(rest), MAX_POST_WORKERS)
+    
+    remaining = reddit.auth.limits.get('remaining')
+    if remaining is not None:
+        workers = min(workers, int(remaining) // REQUESTS_PER_POST)
+    workers = max(1, workers)
+    
+    local = threading.local()
+    
+    def post_from_worker(subreddit_name: str) -> None:
+        if not hasattr(local, 'reddit'):
+            local.reddit = get_reddit_client(credentials)
+        post(local.reddit, subreddit_name)
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(post_from_worker, rest))
+    
+    return post_urls
+
 def main(playlist_url: str = None):
     """
     Main function to post to Reddit
@@ -121,6 +195,14 @@ def main(playlist_url: str = None):
         logger.info("Reddit posting disabled in config")
         return
     
+    # Fail fast on missing credentials (not needed for dry runs) and
+    # malformed templates before loading the database
+    credentials = None if dry_run else get_reddit_credentials()
+    
+    reddit_config = config.get('reddit', {})
+    render_title = compile_template(reddit_config.get('post_title_format', 'On This Day - {month} {day}'))
+    render_body = compile_template(reddit_config.get('post_template', ''))
+    
     # Load videos database
     logger.info("Loading videos database...")
     videos_db = load_videos_db()
@@ -131,81 +213,93 @@ def main(playlist_url: str = None):
     
     # Get today's date
     timezone = config.get('date_parsing', {}).get('timezone', 'America/New_York')
-    month, day, formatted_date = get_today_date(timezone)
-    logger.info(f"Today's date: {formatted_date}")
+    month, day, month_name, day_str, formatted_date = get_today_date(timezone)
+    logger.info("Today's date: %s", formatted_date)
     
     # Find videos for today
     today_videos = get_videos_for_date(videos_db, month, day)
-    logger.info(f"Found {len(today_videos)} videos for this date")
+    logger.info("Found %s videos for this date", len(today_videos))
     
     if not today_videos:
         logger.info("No videos found for today. No post will be made.")
         return
     
-    # Format post content
-    reddit_config = config.get('reddit', {})
+    # Format post title and body from the same placeholder values
+    fmt_ctx = {
+        'month': month_name,
+        'day': day_str,
+        'date': formatted_date,
+        'video_list': format_video_list_for_reddit(today_videos),
+        'playlist_url': playlist_url or 'Coming soon!'
+    }
+    post_title = render_title(fmt_ctx)
+    post_body = render_body(fmt_ctx)
     
-    # Post title
-    post_title = reddit_config.get('post_title_format', 'On This Day - {month} {day}').format(
-        month=formatted_date.split()[0],
-        day=formatted_date.split()[1],
-        date=formatted_date
-    )
-    
-    # Format video list
-    video_list = format_video_list_for_reddit(today_videos)
-    
-    # Post body
-    post_template = reddit_config.get('post_template', '')
-    post_body = post_template.format(
-        month=formatted_date.split()[0],
-        day=formatted_date.split()[1],
-        date=formatted_date,
-        video_list=video_list,
-        playlist_url=playlist_url or 'Coming soon!'
-    )
-    
-    # Preview
-    logger.info("")
-    logger.info("Post preview:")
-    logger.info("-" * 60)
-    logger.info(f"Title: {post_title}")
-    logger.info("")
-    logger.info(post_body)
-    logger.info("-" * 60)
-    logger.info("")
+    # Preview (the body can be several KB, so skip it when INFO is filtered)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("")
+        logger.info("Post preview:")
+        logger.info("-" * 60)
+        logger.info("Title: %s", post_title)
+        logger.info("")
+        logger.info("%s", post_body)
+        logger.info("-" * 60)
+        logger.info("")
     
     if dry_run:
         logger.info("Dry run mode - post not submitted")
         return
     
-    # Authenticate with Reddit
-    logger.info("Authenticating with Reddit...")
-    reddit = get_reddit_client(config)
-    logger.info(f"Authenticated as: u/{reddit.user.me().name}")
-    
-    # Post to subreddit
-    subreddit_name = reddit_config.get('subreddit', 'Adamthewoo')
+    # Post to subreddit(s)
+    subreddits = reddit_config.get('subreddit', 'Adamthewoo')
+    subreddit_names = [subreddits] if isinstance(subreddits, str) else list(subreddits)
     flair_text = reddit_config.get('flair_text')
     
-    logger.info(f"Posting to r/{subreddit_name}...")
-    post_url = create_reddit_post(
-        reddit=reddit,
-        subreddit_name=subreddit_name,
-        title=post_title,
-        body=post_body,
-        flair_text=flair_text,
-        logger=logger
-    )
+    if len(subreddit_names) == 1:
+        # Authenticate with Reddit
+        logger.info("Authenticating with Reddit...")
+        reddit = get_reddit_client(credentials)
+        
+        # Looking up the account costs an extra request; submit() validates credentials anyway
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Authenticated as: u/%s", reddit.user.me().name)
+        
+        logger.info("Posting to r/%s...", subreddit_names[0])
+        post_urls = {
+            subreddit_names[0]: create_reddit_post(
+                reddit=reddit,
+                subreddit_name=subreddit_names[0],
+                title=post_title,
+                body=post_body,
+                flair_text=flair_text,
+                logger=logger
+            )
+        }
+    else:
+        logger.info("Posting to %s subreddits...", len(subreddit_names))
+        post_urls = create_reddit_posts(
+            credentials=credentials,
+            subreddit_names=subreddit_names,
+            title=post_title,
+            body=post_body,
+            flair_text=flair_text,
+            logger=logger
+        )
+    
+    failed = [name for name in subreddit_names if name not in post_urls]
     
     # Results
     logger.info("")
     logger.info("=" * 60)
-    logger.info("POST COMPLETE")
+    logger.info("POST COMPLETE" if not failed else "POST INCOMPLETE")
     logger.info("=" * 60)
-    logger.info(f"Subreddit: r/{subreddit_name}")
-    logger.info(f"Post URL: {post_url}")
+    for subreddit_name, post_url in post_urls.items():
+        logger.info("Subreddit: r/%s", subreddit_name)
+        logger.info("Post URL: %s", post_url)
     logger.info("")
+    
+    if failed:
+        raise Exception(f"Could not create post in: {', '.join('r/' + name for name in failed)}")
 
 if __name__ == '__main__':
     try:
@@ -5,13 +5,8 @@ This script runs daily via GitHub Actions
 
 import os
 import sys
-from datetime import datetime
-from googleapiclient.discovery import build
+import json
 from googleapiclient.errors import HttpError
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-import pickle
 
 # Add src to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -22,19 +17,40 @@ from utils import (
     get_videos_for_date,
     get_today_date,
     get_env_variable,
-    setup_logging
+    setup_logging,
+    compile_template
 )
 
 # OAuth scopes needed for playlist management
 SCOPES = ['https://www.googleapis.com/auth/youtube.force-ssl']
 
+# Maximum number of calls the API accepts in one HTTP batch request
+BATCH_SIZE = 50
+
+# Retries (with exponential backoff) for transient 5xx/429 API errors
+NUM_RETRIES = 5
+
+# Playlist title -> ID mapping kept between runs (next to the token file)
+PLAYLIST_CACHE_FILE = 'playlist_id_cache.json'
+
+# httplib2 response cache, revalidated with ETags between runs
+HTTP_CACHE_DIR = '.httpcache'
+
 def get_authenticated_service():
     """
     Get authenticated YouTube service for playlist management
     Uses OAuth2 credentials from environment or token file
     """
+    # Imported here so dry runs and no-video days don't pay for them
+    import httplib2
+    from google_auth_httplib2 import AuthorizedHttp
+    from googleapiclient.discovery import build
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from google.auth.transport.requests import Request
+    
     credentials = None
-    token_file = 'token.pickle'
+    token_file = 'token.json'
     
     # Check for environment variables (for GitHub Actions)
     client_id = os.getenv('YOUTUBE_CLIENT_ID')
@@ -52,9 +68,8 @@ def get_authenticated_service():
             scopes=SCOPES
         )
     elif os.path.exists(token_file):
-        # Load from pickle file (local development)
-        with open(token_file, 'rb') as token:
-            credentials = pickle.load(token)
+        # Load from token file (local development)
+        credentials = Credentials.from_authorized_user_file(token_file, SCOPES)
     
     # Refresh if expired
     if credentials and credentials.expired and credentials.refresh_token:
@@ -79,8 +94,8 @@ def get_authenticated_service():
             credentials = flow.run_local_server(port=0)
             
             # Save credentials for next run
-            with open(token_file, 'wb') as token:
-                pickle.dump(credentials, token)
+            with open(token_file, 'w') as token:
+                token.write(credentials.to_json())
             
             print("\n" + "=" * 60)
             print("IMPORTANT: Save these for GitHub Secrets:")
@@ -90,7 +105,97 @@ def get_authenticated_service():
         else:
             raise Exception("No YouTube credentials available. Please set environment variables.")
     
-    return build('youtube', 'v3', credentials=credentials)
+    # One persistent connection to googleapis.com for every API call; the
+    # discovery document bundled with the client library is used, not fetched.
+    # The on-disk cache lets unchanged list responses come back as 304s.
+    http = AuthorizedHttp(credentials, http=httplib2.Http(cache=HTTP_CACHE_DIR, timeout=60))
+    return build('youtube', 'v3', http=http, static_discovery=True)
+
+def is_quota_exceeded(error: HttpError) -> bool:
+    """Whether an API error means the daily quota is used up (not worth retrying)"""
+    return error.resp.status == 403 and b'quotaExceeded' in (error.content or b'')
+
+def is_transient(error: HttpError) -> bool:
+    """Whether an API error is worth retrying"""
+    return error.resp.status >= 500 or error.resp.status == 429
+
+def execute_batch(youtube, requests: list, logger) -> list:
+    """
+    Execute API requests in HTTP batches of up to BATCH_SIZE calls
+    
+    Calls that fail with a transient error (or whose whole batch does) are
+    retried individually. Errors are checked after each batch, so an
+    exhausted quota stops the remaining batches from being sent.
+    
+    Args:
+        youtube: Authenticated YouTube API client
+        requests: List of (request_id, request) pairs; IDs must be unique
+        logger: Logger instance
+    
+    Returns:
+        List of request IDs that failed
+    
+    Raises:
+        Exception if the API quota is exceeded
+    """
+    failed = []
+    
+    for start in range(0, len(requests), BATCH_SIZE):
+        chunk = requests[start:start + BATCH_SIZE]
+        errors = {}
+        
+        def callback(request_id, response, exception):
+            if exception is not None:
+                errors[request_id] = exception
+        
+        batch = youtube.new_batch_http_request(callback=callback)
+        for request_id, request in chunk:
+            batch.add(request, request_id=request_id)
+        
+        try:
+            batch.execute()
+        except HttpError as e:
+            # The batch as a whole failed; handle each call as if it had
+            errors = {request_id: e for request_id, _ in chunk}
+        
+        for request_id, request in chunk:
+            error = errors.get(request_id)
+            if error is None:
+                continue
+            
+            if isinstance(error, HttpError):
+                if is_quota_exceeded(error):
+                    raise Exception(f"YouTube API quota exceeded: {error}")
+                
+                if is_transient(error):
+                    try:
+                        request.execute(num_retries=NUM_RETRIES)
+                        continue
+                    except HttpError as e:
+                        if is_quota_exceeded(e):
+                            raise Exception(f"YouTube API quota exceeded: {e}")
+                        error = e
+            
+            logger.warning(f"Request {request_id} failed: {error}")
+            failed.append(request_id)
+    
+    return failed
+
+def load_playlist_cache() -> dict:
+    """Load the playlist title -> ID cache, or an empty dict if unavailable"""
+    try:
+        with open(PLAYLIST_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_playlist_cache(cache: dict) -> None:
+    """Save the playlist title -> ID cache (best-effort)"""
+    try:
+        with open(PLAYLIST_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2, ensure_ascii=False)
+    except OSError:
+        pass
 
 def find_or_create_playlist(youtube, title: str, description: str, logger) -> str:
     """
@@ -105,20 +210,52 @@ def find_or_create_playlist(youtube, title: str, description: str, logger) -> st
     Returns:
         Playlist ID
     """
+    cache = load_playlist_cache()
+    
     try:
-        # Search for existing playlist
-        request = youtube.playlists().list(
-            part='snippet',
-            mine=True,
-            maxResults=50
-        )
-        response = request.execute()
+        # Check that the cached playlist still exists
+        cached_id = cache.get(title)
+        if cached_id:
+            request = youtube.playlists().list(
+                part='id',
+                id=cached_id,
+                fields='items/id'
+            )
+            response = request.execute(num_retries=NUM_RETRIES)
+            
+            if response.get('items'):
+                logger.info(f"Found cached playlist: {cached_id}")
+                return cached_id
         
-        for item in response.get('items', []):
-            if item['snippet']['title'] == title:
-                playlist_id = item['id']
+        # Search for existing playlist, page by page
+        next_page_token = None
+        
+        while True:
+            request = youtube.playlists().list(
+                part='snippet',
+                mine=True,
+                maxResults=50,
+                pageToken=next_page_token,
+                fields='items(id,snippet/title),nextPageToken'
+            )
+            response = request.execute(num_retries=NUM_RETRIES)
+            
+            # Reversed so the first playlist wins if titles repeat
+            title_to_id = {
+                item['snippet']['title']: item['id']
+                for item in reversed(response.get('items', []))
+            }
+            
+            if title in title_to_id:
+                playlist_id = title_to_id[title]
                 logger.info(f"Found existing playlist: {playlist_id}")
+                cache[title] = playlist_id
+                save_playlist_cache(cache)
                 return playlist_id
+            
+            next_page_token = response.get('nextPageToken')
+            if not next_page_token:
+                break
         
         # Create new playlist if not found
         logger.info(f"Creating new playlist: {title}")
@@ -132,88 +269,138 @@ def find_or_create_playlist(youtube, title: str, description: str, logger) -> st
                 'status': {
                     'privacyStatus': 'public'
                 }
-            }
+            },
+            fields='id'
         )
-        response = request.execute()
+        response = request.execute(num_retries=NUM_RETRIES)
         playlist_id = response['id']
         logger.info(f"Created playlist: {playlist_id}")
+        cache[title] = playlist_id
+        save_playlist_cache(cache)
         return playlist_id
         
     except HttpError as e:
         raise Exception(f"Error managing playlist: {e}")
 
-def clear_playlist(youtube, playlist_id: str, logger) -> None:
+def sync_playlist(youtube, playlist_id: str, desired_video_ids: list, logger) -> int:
     """
-    Remove all videos from a playlist
+    Make a playlist contain exactly the desired videos
+    
+    Only videos that are no longer wanted (or duplicated) are removed and
+    only missing videos are inserted at their position, so a day whose
+    videos haven't changed costs no write calls. If the videos being kept
+    are out of order, the playlist is rebuilt instead.
     
     Args:
         youtube: Authenticated YouTube API client
-        playlist_id: Playlist ID to clear
+        playlist_id: Playlist ID to sync
+        desired_video_ids: Video IDs the playlist should contain, in order
         logger: Logger instance
+    
+    Returns:
+        Number of desired videos in the playlist after syncing
     """
+    desired = set(desired_video_ids)
+    
     try:
-        # Get all items in playlist
+        # Map current videos to their playlist item IDs
         next_page_token = None
-        item_ids = []
+        current = {}
+        to_delete = []
         
         while True:
             request = youtube.playlistItems().list(
-                part='id',
+                part='snippet',
                 playlistId=playlist_id,
                 maxResults=50,
-                pageToken=next_page_token
+                pageToken=next_page_token,
+                fields='items(id,snippet/resourceId/videoId),nextPageToken'
             )
-            response = request.execute()
+            response = request.execute(num_retries=NUM_RETRIES)
             
             for item in response.get('items', []):
-                item_ids.append(item['id'])
+                video_id = item['snippet']['resourceId']['videoId']
+                if video_id in desired and video_id not in current:
+                    current[video_id] = item['id']
+                else:
+                    to_delete.append(item['id'])
             
             next_page_token = response.get('nextPageToken')
             if not next_page_token:
                 break
-        
-        # Delete each item
-        for item_id in item_ids:
-            youtube.playlistItems().delete(id=item_id).execute()
-        
-        logger.info(f"Cleared {len(item_ids)} videos from playlist")
-        
     except HttpError as e:
-        logger.error(f"Error clearing playlist: {e}")
+        raise Exception(f"Error reading playlist items: {e}")
+    
+    # Missing videos can only be slotted in if the kept ones are in order
+    if list(current) != [video_id for video_id in desired_video_ids if video_id in current]:
+        logger.info("Playlist is out of order - rebuilding it")
+        to_delete.extend(current.values())
+        current = {}
+    
+    # Delete items in batches rather than one round-trip each
+    failed = execute_batch(
+        youtube,
+        [(item_id, youtube.playlistItems().delete(id=item_id)) for item_id in to_delete],
+        logger
+    )
+    logger.info(f"Removed {len(to_delete) - len(failed)} videos from playlist")
+    
+    added = add_videos_to_playlist(youtube, playlist_id, desired_video_ids, logger, present=current)
+    logger.info(f"Added {added} videos to playlist ({len(current)} already present)")
+    
+    return len(current) + added
 
-def add_videos_to_playlist(youtube, playlist_id: str, video_ids: list, logger) -> int:
+def add_videos_to_playlist(youtube, playlist_id: str, video_ids: list, logger,
+                           present=()) -> int:
     """
-    Add videos to playlist
+    Add videos to playlist in the given order
     
     Args:
         youtube: Authenticated YouTube API client
         playlist_id: Playlist ID
-        video_ids: List of video IDs to add
+        video_ids: List of video IDs the playlist should hold, in order
         logger: Logger instance
+        present: Video IDs already in the playlist (in the same relative
+            order); these are skipped and the rest inserted around them
     
     Returns:
         Number of videos successfully added
     """
     added = 0
+    position = 0
+    
+    # Past the last video already present, inserts can simply append; only
+    # positioned inserts need the playlist to be sorted manually
+    last_present = max((i for i, video_id in enumerate(video_ids) if video_id in present), default=-1)
     
-    for video_id in video_ids:
+    for index, video_id in enumerate(video_ids):
+        if video_id in present:
+            position += 1
+            continue
+        
+        snippet = {
+            'playlistId': playlist_id,
+            'resourceId': {
+                'kind': 'youtube#video',
+                'videoId': video_id
+            }
+        }
+        if index < last_present:
+            snippet['position'] = position
+        
         try:
             request = youtube.playlistItems().insert(
                 part='snippet',
-                body={
-                    'snippet': {
-                        'playlistId': playlist_id,
-                        'resourceId': {
-                            'kind': 'youtube#video',
-                            'videoId': video_id
-                        }
-                    }
-                }
+                body={'snippet': snippet},
+                fields='id'
             )
-            request.execute()
+            request.execute(num_retries=NUM_RETRIES)
             added += 1
+            position += 1
             
         except HttpError as e:
+            if is_quota_exceeded(e):
+                raise Exception(f"YouTube API quota exceeded: {e}")
             logger.warning(f"Could not add video {video_id}: {e}")
     
     return added
@@ -244,7 +431,7 @@ def main():
     
     # Get today's date
     timezone = config.get('date_parsing', {}).get('timezone', 'America/New_York')
-    month, day, formatted_date = get_today_date(timezone)
+    month, day, month_name, day_str, formatted_date = get_today_date(timezone)
     logger.info(f"Today's date: {formatted_date} (Month: {month}, Day: {day})")
     
     # Find videos for today
@@ -255,10 +442,12 @@ def main():
         logger.info("No videos found for today. Exiting.")
         return
     
-    # Display videos
+    # Display videos, collecting their IDs on the way
+    video_ids = []
     for video in today_videos:
         year = video.get('recording_date', '')[:4]
         logger.info(f"  - {year}: {video.get('title')}")
+        video_ids.append(video['video_id'])
     
     if dry_run:
         logger.info("Dry run mode - would have updated playlist with these videos")
@@ -275,29 +464,21 @@ def main():
     
     # Format playlist title and description
     playlist_config = config.get('playlist', {})
-    playlist_title = playlist_config.get('title_format', 'On This Day: {month} {day}').format(
-        month=formatted_date.split()[0],
-        day=formatted_date.split()[1]
-    )
-    
-    playlist_description = playlist_config.get('description_format', '').format(
-        month=formatted_date.split()[0],
-        day=formatted_date.split()[1],
-        date=formatted_date
-    )
+    fmt_ctx = {
+        'month': month_name,
+        'day': day_str,
+        'date': formatted_date
+    }
+    playlist_title = compile_template(playlist_config.get('title_format', 'On This Day: {month} {day}'))(fmt_ctx)
+    playlist_description = compile_template(playlist_config.get('description_format', ''))(fmt_ctx)
     
     # Find or create playlist
     logger.info(f"Managing playlist: {playlist_title}")
     playlist_id = find_or_create_playlist(youtube, playlist_title, playlist_description, logger)
     
-    # Clear existing videos
-    logger.info("Clearing existing playlist items...")
-    clear_playlist(youtube, playlist_id, logger)
-    
-    # Add today's videos
-    logger.info("Adding videos to playlist...")
-    video_ids = [v['video_id'] for v in today_videos]
-    added = add_videos_to_playlist(youtube, playlist_id, video_ids, logger)
+    # Sync playlist items with today's videos
+    logger.info("Syncing playlist items...")
+    synced = sync_playlist(youtube, playlist_id, video_ids, logger)
     
     # Results
     playlist_url = f"https://www.youtube.com/playlist?list={playlist_id}"
@@ -307,7 +488,7 @@ def main():
     logger.info("UPDATE COMPLETE")
     logger.info("=" * 60)
     logger.info(f"Playlist: {playlist_title}")
-    logger.info(f"Videos added: {added}/{len(today_videos)}")
+    logger.info(f"Videos in playlist: {synced}/{len(today_videos)}")
     logger.info(f"Playlist URL: {playlist_url}")
     logger.info("")
     
@@ -2,14 +2,22 @@
 Utility functions for Adam The Woo - On This Day memorial project
 """
 
-import json
+import calendar
 import os
 import logging
+import pickle
+import re
+import shutil
+import string
+from collections import defaultdict
 from datetime import datetime
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Callable, Dict, List, Mapping, Optional, Pattern, Tuple
+from zoneinfo import ZoneInfo
+import orjson
 import yaml
+from dateutil import parser as _dateutil_parser
 from dotenv import load_dotenv
-import pytz
 
 # Load environment variables
 load_dotenv()
@@ -44,8 +52,14 @@ def load_config() -> Dict:
         raise Exception(f"Error parsing configuration file: {e}")
 
 def load_videos_db() -> Dict:
-    """Load videos database from JSON file"""
+    """
+    Load videos database from JSON file
+    
+    The parsed and indexed database is cached in data/videos.cache.pkl and
+    reused for as long as videos.json is unchanged on disk.
+    """
     db_path = os.path.join('data', 'videos.json')
+    cache_path = os.path.join('data', 'videos.cache.pkl')
     
     if not os.path.exists(db_path):
         # Return empty structure if database doesn't exist yet
@@ -59,15 +73,85 @@ def load_videos_db() -> Dict:
             "videos": []
         }
     
+    db_stat = os.stat(db_path)
+    
+    # Reuse the cache if videos.json hasn't changed since it was written
+    try:
+        with open(cache_path, 'rb') as f:
+            cache = pickle.load(f)
+        if (cache['mtime'], cache['size']) == (db_stat.st_mtime_ns, db_stat.st_size):
+            return cache['videos_db']
+    except Exception:
+        pass
+    
     try:
-        with open(db_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
+        with open(db_path, 'rb') as f:
+            videos_db = orjson.loads(f.read())
+    except orjson.JSONDecodeError as e:
         raise Exception(f"Error parsing videos database: {e}")
+    
+    build_date_index(videos_db)
+    
+    # Caching is best-effort; a failed write only costs a re-parse next run
+    try:
+        with open(cache_path, 'wb') as f:
+            pickle.dump(
+                {'mtime': db_stat.st_mtime_ns, 'size': db_stat.st_size, 'videos_db': videos_db},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL
+            )
+    except OSError as e:
+        logging.warning("Could not write videos cache: %s", e)
+    
+    return videos_db
 
-def save_videos_db(data: Dict) -> None:
-    """Save videos database to JSON file"""
+def build_date_index(videos_db: Dict) -> Dict:
+    """
+    Index videos by (month, day) of their recording date
+    
+    The index is stored under videos_db['_date_index'] and each bucket is
+    sorted by recording date (oldest first).
+    
+    Args:
+        videos_db: Videos database dictionary
+    
+    Returns:
+        Dictionary mapping (month, day) to a list of video dictionaries
+    """
+    index = defaultdict(list)
+    
+    for video in videos_db.get('videos', []):
+        recording_date = video.get('recording_date')
+        
+        if recording_date:
+            # Dates are stored as YYYY-MM-DD, so slice instead of parsing
+            try:
+                key = (int(recording_date[5:7]), int(recording_date[8:10]))
+            except ValueError:
+                continue
+            index[key].append(video)
+    
+    # Sort by year (oldest first)
+    for bucket in index.values():
+        bucket.sort(key=lambda v: v['recording_date'])
+    
+    videos_db['_date_index'] = dict(index)
+    return videos_db['_date_index']
+
+def save_videos_db(data: Dict, backup: bool = False) -> None:
+    """
+    Save videos database to JSON file
+    
+    The new file is written next to videos.json and atomically renamed into
+    place. With backup=True the previous file is kept as videos.json.backup
+    via a hardlink (falling back to a copy where links aren't supported).
+    
+    Args:
+        data: Videos database dictionary
+        backup: Whether to keep the previous database as a backup
+    """
     db_path = os.path.join('data', 'videos.json')
+    new_path = f"{db_path}.new"
     
     # Create data directory if it doesn't exist
     os.makedirs('data', exist_ok=True)
@@ -75,45 +159,144 @@ def save_videos_db(data: Dict) -> None:
     # Update last_updated timestamp
     data['channel_info']['last_updated'] = datetime.now().isoformat()
     
+    # Derived keys (e.g. the date index) are not persisted
+    data = {key: value for key, value in data.items() if not key.startswith('_')}
+    
     try:
-        with open(db_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with open(new_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        
+        if backup and os.path.exists(db_path):
+            backup_path = f"{db_path}.backup"
+            
+            # Link the current file as the backup; once the new file replaces
+            # videos.json, the backup is the only name left for the old one
+            try:
+                os.remove(backup_path)
+            except FileNotFoundError:
+                pass
+            try:
+                os.link(db_path, backup_path)
+            except OSError:
+                shutil.copy2(db_path, backup_path)
+            logging.info("Created backup: %s", backup_path)
+        
+        os.replace(new_path, db_path)
     except Exception as e:
         raise Exception(f"Error saving videos database: {e}")
 
-def parse_date_from_title(title: str, config: Dict) -> Optional[datetime]:
+def save_descriptions(descriptions: Dict[str, str]) -> bool:
     """
-    Try to extract a date from video title using configured patterns
+    Save video descriptions to data/descriptions.jsonl
+    
+    Descriptions are kept out of videos.json since the daily jobs never
+    read them. Each line is a {"video_id": ..., "description": ...} object.
+    The file is only rewritten if it is missing or its content differs.
     
     Args:
-        title: Video title
-        config: Configuration dictionary with date_parsing patterns
+        descriptions: Dictionary mapping video ID to description
     
     Returns:
-        datetime object if date found, None otherwise
+        True if the file was written, False if it was already up to date
     """
-    from dateutil import parser
+    descriptions_path = os.path.join('data', 'descriptions.jsonl')
     
-    patterns = config.get('date_parsing', {}).get('title_patterns', [])
-    
-    # Try each pattern
-    for pattern in patterns:
-        try:
-            # Try to find a date string matching the pattern
-            date_obj = datetime.strptime(title, pattern)
-            return date_obj
-        except ValueError:
-            continue
+    content = b''.join(
+        orjson.dumps({'video_id': video_id, 'description': description}) + b'\n'
+        for video_id, description in descriptions.items()
+    )
     
-    # Try dateutil parser as fallback (more flexible)
     try:
-        date_obj = parser.parse(title, fuzzy=True)
-        return date_obj
-    except:
+        with open(descriptions_path, 'rb') as f:
+            if f.read() == content:
+                return False
+    except OSError:
         pass
     
+    # Create data directory if it doesn't exist
+    os.makedirs('data', exist_ok=True)
+    
+    try:
+        with open(descriptions_path, 'wb') as f:
+            f.write(content)
+    except Exception as e:
+        raise Exception(f"Error saving video descriptions: {e}")
+    
+    return True
+
+# Regex equivalents of the strptime directives used in title patterns
+_DIRECTIVE_REGEX = {
+    '%d': r'\d{1,2}',
+    '%m': r'\d{1,2}',
+    '%Y': r'\d{4}',
+    '%y': r'\d{2}',
+    '%B': '(?:' + '|'.join(calendar.month_name[1:]) + ')',
+    '%b': '(?:' + '|'.join(calendar.month_abbr[1:]) + ')',
+    '%%': '%',
+}
+
+# Only titles containing something that looks like a year go to dateutil
+_YEAR_REGEX = re.compile(r'\b(?:19|20)\d{2}\b')
+
+def _strptime_to_regex(pattern: str) -> Optional[Pattern]:
+    """Translate a strptime pattern into a regex, or None if unsupported"""
+    parts = []
+    
+    for token in re.split(r'(%.)', pattern):
+        if token.startswith('%') and len(token) == 2:
+            if token not in _DIRECTIVE_REGEX:
+                return None
+            parts.append(_DIRECTIVE_REGEX[token])
+        elif token:
+            # strptime lets whitespace in the pattern match any run of whitespace
+            parts.append(r'\s+'.join(re.escape(chunk) for chunk in re.split(r'\s+', token)))
+    
+    return re.compile(r'(?<!\d)' + ''.join(parts) + r'(?!\d)', re.IGNORECASE)
+
+@lru_cache(maxsize=None)
+def _compile_patterns(patterns: Tuple[str, ...]) -> List[Tuple[Optional[Pattern], str]]:
+    """Compile configured title patterns into (regex, strptime_format) pairs"""
+    return [(_strptime_to_regex(pattern), pattern) for pattern in patterns]
+
+@lru_cache(maxsize=4096)
+def _parse_date_from_title(title: str, patterns: Tuple[str, ...]) -> Optional[datetime]:
+    """Cached implementation of parse_date_from_title"""
+    # Try each pattern on the date-shaped substrings of the title
+    for regex, pattern in _compile_patterns(patterns):
+        if regex is None:
+            candidates = [title]
+        else:
+            candidates = [match.group(0) for match in regex.finditer(title)]
+        
+        for candidate in candidates:
+            try:
+                return datetime.strptime(candidate, pattern)
+            except ValueError:
+                continue
+    
+    # Try dateutil parser as fallback (more flexible, but slow)
+    if _YEAR_REGEX.search(title):
+        try:
+            return _dateutil_parser.parse(title, fuzzy=True)
+        except (ValueError, OverflowError):
+            pass
+    
     return None
 
+def parse_date_from_title(title: str, config: Dict) -> Optional[datetime]:
+    """
+    Try to extract a date from video title using configured patterns
+    
+    Args:
+        title: Video title
+        config: Configuration dictionary with date_parsing patterns
+    
+    Returns:
+        datetime object if date found, None otherwise
+    """
+    patterns = tuple(config.get('date_parsing', {}).get('title_patterns', []))
+    return _parse_date_from_title(title, patterns)
+
 def get_videos_for_date(videos_db: Dict, month: int, day: int) -> List[Dict]:
     """
     Get all videos recorded on a specific month/day across all years
@@ -126,23 +309,11 @@ def get_videos_for_date(videos_db: Dict, month: int, day: int) -> List[Dict]:
     Returns:
         List of video dictionaries matching the date
     """
-    matching_videos = []
-    
-    for video in videos_db.get('videos', []):
-        recording_date = video.get('recording_date')
-        
-        if recording_date:
-            try:
-                date_obj = datetime.fromisoformat(recording_date)
-                if date_obj.month == month and date_obj.day == day:
-                    matching_videos.append(video)
-            except ValueError:
-                continue
-    
-    # Sort by year (oldest first)
-    matching_videos.sort(key=lambda v: v.get('recording_date', ''))
+    date_index = videos_db.get('_date_index')
+    if date_index is None:
+        date_index = build_date_index(videos_db)
     
-    return matching_videos
+    return date_index.get((month, day), [])
 
 def get_today_date(timezone_str: str = None) -> tuple:
     """
@@ -152,17 +323,19 @@ def get_today_date(timezone_str: str = None) -> tuple:
         timezone_str: Timezone string (e.g., 'America/New_York')
     
     Returns:
-        Tuple of (month, day, formatted_date_string)
+        Tuple of (month, day, month_name, day_string, formatted_date_string)
     """
     if timezone_str:
-        tz = pytz.timezone(timezone_str)
-        now = datetime.now(tz)
+        # ZoneInfo caches zones, so repeated calls don't re-read tzdata
+        now = datetime.now(ZoneInfo(timezone_str))
     else:
         now = datetime.now()
     
-    formatted_date = now.strftime('%B %d')  # e.g., "January 4"
+    month_name = now.strftime('%B')  # e.g., "January"
+    day_str = now.strftime('%d')     # e.g., "04"
+    formatted_date = f"{month_name} {day_str}"
     
-    return now.month, now.day, formatted_date
+    return now.month, now.day, month_name, day_str, formatted_date
 
 def format_video_list_for_reddit(videos: List[Dict]) -> str:
     """
@@ -177,16 +350,49 @@ def format_video_list_for_reddit(videos: List[Dict]) -> str:
     if not videos:
         return "*No videos found for this date.*"
     
-    lines = []
-    for video in videos:
+    def format_line(video: Dict) -> str:
         recording_date = video.get('recording_date', '')
-        year = datetime.fromisoformat(recording_date).year if recording_date else 'Unknown'
+        # Dates are stored as YYYY-MM-DD, so the year is the first 4 characters
+        year = recording_date[:4] if recording_date else 'Unknown'
         title = video.get('title', 'Untitled')
         url = video.get('url', '')
         
-        lines.append(f"**{year}:** [{title}]({url})")
+        return f"**{year}:** [{title}]({url})"
+    
+    return '\n\n'.join(format_line(video) for video in videos)
+
+@lru_cache(maxsize=None)
+def compile_template(template: str) -> Callable[[Mapping], str]:
+    """
+    Compile a str.format template into a render function
     
-    return '\n\n'.join(lines)
+    The template is split into literal text and field names once, so
+    rendering only looks up values and joins the pieces. Templates using
+    conversions, format specs or attribute/index access fall back to
+    str.format_map.
+    
+    Args:
+        template: Template string with {placeholder} fields
+    
+    Returns:
+        Function that renders the template from a mapping of field values
+    """
+    segments = []
+    
+    for literal, field_name, format_spec, conversion in string.Formatter().parse(template):
+        if field_name is not None and (format_spec or conversion or not field_name.isidentifier()):
+            return template.format_map
+        segments.append((literal, field_name))
+    
+    def render(values: Mapping) -> str:
+        parts = []
+        for literal, field_name in segments:
+            parts.append(literal)
+            if field_name is not None:
+                parts.append(format(values[field_name]))
+        return ''.join(parts)
+    
+    return render
 
 def get_env_variable(var_name: str, required: bool = True) -> Optional[str]:
     """
@@ -208,11 +414,3 @@ def get_env_variable(var_name: str, required: bool = True) -> Optional[str]:
         raise Exception(f"Required environment variable not set: {var_name}")
     
     return value
-
-def create_backup(file_path: str) -> None:
-    """Create a backup of a file"""
-    if os.path.exists(file_path):
-        backup_path = f"{file_path}.backup"
-        import shutil
-        shutil.copy2(file_path, backup_path)
-        logging.info(f"Created backup: {backup_path}")